@@ -30,21 +30,59 @@ import argparse
 import os
 import re
 import glob
+import hashlib
 import shutil
+import sys
 import tempfile
+import threading
 import subprocess
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple, Optional, Set, Union
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from dataclasses import dataclass, field as dc_field
+from typing import Any, Dict, FrozenSet, Iterator, List, Tuple, Optional, TextIO, Union
 
 from pddl_formula import PDDLFormulaError, validate_goal_formula
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib json module
+    orjson = None
+
+try:
+    import blake3
+except ImportError:  # optional: fall back to hashlib.blake2b
+    blake3 = None
+
 # -----------------------------
 # Utilities
 # -----------------------------
 
-def atom(pred: str, *args: str) -> str:
-    return f"({pred} {' '.join(args)})" if args else f"({pred})"
+if orjson is not None:
+    def _loads(raw: bytes) -> Any:
+        return orjson.loads(raw)
+
+    def _dumps(obj: Any) -> str:
+        # Same bytes as the fallback below: 2-space indent, non-ASCII kept as UTF-8
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+else:
+    def _loads(raw: bytes) -> Any:
+        # Decode explicitly: json.loads(bytes) would also accept a UTF-8 BOM
+        # and UTF-16/32 input, which orjson rejects.
+        return json.loads(raw.decode("utf-8"))
+
+    def _dumps(obj: Any) -> str:
+        # ensure_ascii=False matches orjson, which never \u-escapes
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+# Fixed-arity atom builders: no *args tuple packing and no inner join.
+def _atom1(pred: str, a: str) -> str:
+    return f"({pred} {a})"
+
+def _atom2(pred: str, a: str, b: str) -> str:
+    return f"({pred} {a} {b})"
 
 def and_formula(atoms: List[str]) -> str:
     if not atoms:
@@ -52,26 +90,31 @@ def and_formula(atoms: List[str]) -> str:
         return "(and)"
     if len(atoms) == 1:
         return atoms[0]
-    return "(and " + " ".join(atoms) + ")"
+    return f"(and {' '.join(atoms)})"
 
 def is_name(s: Any) -> bool:
     return isinstance(s, str) and len(s) > 0
 
-def canonical_keys(obj: Union[List[str], Dict[str, Any]]) -> List[str]:
+def canonical_keys(obj: Union[List[str], Dict[str, Any]], sort: bool = False) -> List[str]:
     """
     Deterministic ordering:
     - If a list is provided, preserve the list order.
-    - If a dict is provided, sort keys lexicographically.
+    - If a dict is provided, preserve the key order of the JSON source
+      (or sort keys lexicographically if sort=True).
     """
     if isinstance(obj, list):
         return obj
-    return sorted(obj.keys())
+    return sorted(obj) if sort else list(obj)
 
 
 # -----------------------------
 # Parsing / normalization
 # -----------------------------
 
+_MISSING = object()
+
+REQUIRED_FIELDS = ("problem_name", "locations", "boxes", "initial_state", "goal")
+
 @dataclass
 class ProblemSpec:
     problem_name: str
@@ -87,24 +130,40 @@ class ProblemSpec:
     goal_at: List[Tuple[str, str]]
     goal_clear: List[str]
     goal_pddl: List[str]
-
-def parse_named_objects(field: Any, kind: str) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    # Membership views of locations/boxes. load_ProblemSpec passes in the sets
+    # it already built for validation; otherwise they are derived here.
+    loc_set: FrozenSet[str] = dc_field(default_factory=frozenset, repr=False, compare=False)
+    box_set: FrozenSet[str] = dc_field(default_factory=frozenset, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not self.loc_set:
+            self.loc_set = frozenset(self.locations)
+        if not self.box_set:
+            self.box_set = frozenset(self.boxes)
+
+def parse_named_objects(field: Any, kind: str, sort_keys: bool = False) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
     """
     Accepts either:
       - ["L1", "L2"] or ["B1", "B2"]
       - {"L1": {...}, "L2": {...}} or {"B1": {...}, ...}
 
-    Returns (names, props_map).
+    Returns (names, props_map). Names keep their JSON order unless
+    sort_keys is set, in which case object keys are sorted.
+
+    Names are interned: they are hashed and compared over and over during
+    validation and emission, and interning lets those hit the identity
+    fast path.
     """
     if isinstance(field, list):
-        names = field
-        if not all(is_name(x) for x in names):
-            raise ValueError(f'"{kind}" list must contain only strings')
+        bad = next((x for x in field if type(x) is not str or not x), _MISSING)
+        if bad is not _MISSING:
+            raise ValueError(f'"{kind}" list must contain only non-empty strings; got {bad!r}')
+        names = [sys.intern(n) for n in field]
         props = {n: {} for n in names}
         return names, props
 
     if isinstance(field, dict):
-        names = canonical_keys(field)
+        names = [sys.intern(n) for n in canonical_keys(field, sort=sort_keys)]
         props: Dict[str, Dict[str, Any]] = {}
         for n in names:
             v = field[n]
@@ -119,24 +178,75 @@ def parse_named_objects(field: Any, kind: str) -> Tuple[List[str], Dict[str, Dic
     raise ValueError(f'"{kind}" must be either a list of names or an object mapping name -> properties')
 
 
-def load_ProblemSpec(path: str) -> ProblemSpec:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+def optional_list(obj: Dict[str, Any], key: str, error: str) -> List[Any]:
+    """
+    Return obj[key] as a list, treating a missing key or null as [].
+    Raises ValueError(error) if the value is present but not a list.
+    """
+    value = obj.get(key)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(error)
+    return value
+
+
+def as_pair(pair: Any, error: str, member_error: str) -> Tuple[Any, Any]:
+    """
+    Unpack a two-element list entry, raising ValueError(error) for any other
+    shape and ValueError(member_error) if a member is a nested list/object.
+    """
+    # Strings and objects would otherwise unpack too (e.g. "B1" -> "B", "1").
+    if not isinstance(pair, (list, tuple)):
+        raise ValueError(error)
+    try:
+        a, b = pair
+    except ValueError:
+        raise ValueError(error) from None
+    # Unhashable members would make the caller's set lookups raise TypeError;
+    # other non-names (numbers, null) fail those membership checks instead.
+    if isinstance(a, (list, dict)) or isinstance(b, (list, dict)):
+        raise ValueError(f"{member_error}; got {pair!r}")
+    return a, b
+
+
+def load_ProblemSpec(path: str, sort_keys: bool = False, validate: bool = True) -> ProblemSpec:
+    with open(path, "rb") as f:
+        return loads_ProblemSpec(f.read(), sort_keys=sort_keys, validate=validate)
+
+
+def loads_ProblemSpec(raw: bytes, sort_keys: bool = False, validate: bool = True) -> ProblemSpec:
+    """
+    Parse and validate a JSON instance given as raw (UTF-8) bytes.
+
+    validate=False skips validate_spec() (the check that every box appears
+    exactly once across holding and stacks) for trusted, generated input;
+    per-field shape and reference checks always run.
+    """
+    data = _loads(raw)
 
     # Required top-level fields
-    for key in ["problem_name", "locations", "boxes", "initial_state", "goal"]:
-        if key not in data:
-            raise ValueError(f"Missing required top-level field: {key}")
+    if not isinstance(data, dict):
+        raise ValueError("Top-level JSON value must be an object")
+    missing = [key for key in REQUIRED_FIELDS if key not in data]
+    if missing:
+        plural = "s" if len(missing) > 1 else ""
+        raise ValueError(f"Missing required top-level field{plural}: {', '.join(missing)}")
 
     problem_name = data["problem_name"]
     if not is_name(problem_name):
         raise ValueError('"problem_name" must be a non-empty string')
 
-    locations, loc_props = parse_named_objects(data["locations"], "locations")
-    boxes, box_props = parse_named_objects(data["boxes"], "boxes")
+    locations, loc_props = parse_named_objects(data["locations"], "locations", sort_keys)
+    boxes, box_props = parse_named_objects(data["boxes"], "boxes", sort_keys)
 
-    loc_set = set(locations)
-    box_set = set(boxes)
+    loc_set = frozenset(locations)
+    box_set = frozenset(boxes)
+
+    # Names are interned by parse_named_objects; every other reference to an
+    # object below is interned too (once validated), so later set/dict
+    # lookups and comparisons resolve by identity.
+    intern = sys.intern
 
     # initial_state
     init = data["initial_state"]
@@ -146,8 +256,11 @@ def load_ProblemSpec(path: str) -> ProblemSpec:
     if "robot_at" not in init:
         raise ValueError('Missing required field: initial_state.robot_at')
     robot_at = init["robot_at"]
+    if not is_name(robot_at):
+        raise ValueError('initial_state.robot_at must be a location name string')
     if robot_at not in loc_set:
         raise ValueError(f'initial_state.robot_at="{robot_at}" is not in locations')
+    robot_at = intern(robot_at)
 
     holding = init.get("holding", None)
     if holding is None:
@@ -157,7 +270,7 @@ def load_ProblemSpec(path: str) -> ProblemSpec:
             raise ValueError('initial_state.holding must be a box name string or null')
         if holding not in box_set:
             raise ValueError(f'initial_state.holding="{holding}" is not in boxes')
-        holding_box = holding
+        holding_box = intern(holding)
 
     if "stacks" not in init:
         raise ValueError("Missing required field: initial_state.stacks")
@@ -176,27 +289,33 @@ def load_ProblemSpec(path: str) -> ProblemSpec:
             raise ValueError(f'initial_state.stacks["{l}"] must be a list (top->bottom)')
         if len(stack) == 0:
             continue
-        if not all(is_name(b) for b in stack):
-            raise ValueError(f'initial_state.stacks["{l}"] must contain only box name strings')
-        for b in stack:
-            if b not in box_set:
-                raise ValueError(f'initial_state.stacks["{l}"] contains unknown box "{b}"')
-        stacks[l] = stack
+        # box_set holds only valid names, so non-strings/empty strings end up
+        # in `unknown` too; only that (normally empty) set needs type checks.
+        try:
+            boxes_in_stack = set(stack)
+        except TypeError:  # unhashable entries such as nested lists/objects
+            raise ValueError(f'initial_state.stacks["{l}"] must contain only box name strings') from None
+        unknown = boxes_in_stack - box_set
+        if unknown:
+            if not all(is_name(b) for b in unknown):
+                raise ValueError(f'initial_state.stacks["{l}"] must contain only box name strings')
+            raise ValueError(f'initial_state.stacks["{l}"] contains unknown boxes: {sorted(unknown)}')
+        if len(boxes_in_stack) != len(stack):
+            raise ValueError(f'Stack at location "{l}" contains duplicate box names: {stack}')
+        stacks[intern(l)] = [intern(b) for b in stack]
 
     # forbidden_stack (optional)
-    forbidden_stack_raw = data.get("forbidden_stack", [])
-    if forbidden_stack_raw is None:
-        forbidden_stack_raw = []
-    if not isinstance(forbidden_stack_raw, list):
-        raise ValueError('"forbidden_stack" must be a list of [top,bottom] pairs')
+    forbidden_stack_raw = optional_list(data, "forbidden_stack", '"forbidden_stack" must be a list of [top,bottom] pairs')
     forbidden_stack: List[Tuple[str, str]] = []
     for pair in forbidden_stack_raw:
-        if not (isinstance(pair, list) or isinstance(pair, tuple)) or len(pair) != 2:
-            raise ValueError('Each forbidden_stack entry must be a pair [top, bottom]')
-        top, bottom = pair[0], pair[1]
+        top, bottom = as_pair(
+            pair,
+            'Each forbidden_stack entry must be a pair [top, bottom]',
+            'forbidden_stack pair members must be box names',
+        )
         if top not in box_set or bottom not in box_set:
             raise ValueError(f'forbidden_stack pair must reference boxes; got [{top}, {bottom}]')
-        forbidden_stack.append((top, bottom))
+        forbidden_stack.append((intern(top), intern(bottom)))
 
     # goal (v2): {"on": [[top, support], ...]
     #             "box-at" : [[box, location], ...] 
@@ -206,56 +325,44 @@ def load_ProblemSpec(path: str) -> ProblemSpec:
     if not isinstance(goal, dict):
         raise ValueError('"goal" must be an object')
 
-    goal_on_raw = goal.get("on", [])
-    if goal_on_raw is None:
-        goal_on_raw = []
-    if not isinstance(goal_on_raw, list):
-        raise ValueError('goal.on must be a list of [top, support] pairs')
+    goal_on_raw = optional_list(goal, "on", 'goal.on must be a list of [top, support] pairs')
     goal_on: List[Tuple[str, str]] = []
     for pair in goal_on_raw:
-        if not (isinstance(pair, list) or isinstance(pair, tuple)) or len(pair) != 2:
-            raise ValueError('Each goal.on entry must be a pair [top, support]')
-        top, support = pair[0], pair[1]
+        top, support = as_pair(
+            pair,
+            'Each goal.on entry must be a pair [top, support]',
+            'goal.on pair members must be box or location names',
+        )
         if top not in box_set:
             raise ValueError(f'goal.on top must be a box; got "{top}"')
         if support not in box_set and support not in loc_set:
             raise ValueError(f'goal.on support must be a box or location; got "{support}"')
-        goal_on.append((top, support))
+        goal_on.append((intern(top), intern(support)))
 
-    goal_at_raw = goal.get("box-at", [])
-    if goal_at_raw is None:
-        goal_at_raw = []
-    if not isinstance(goal_at_raw, list):
-        raise ValueError('goal.box-at must be a list of [box, location] pairs')
+    goal_at_raw = optional_list(goal, "box-at", 'goal.box-at must be a list of [box, location] pairs')
     goal_at: List[Tuple[str, str]] = []
     for pair in goal_at_raw:
-        if not (isinstance(pair, list) or isinstance(pair, tuple)) or len(pair) != 2:
-            raise ValueError('Each goal.box-at entry must be a pair [box, location]')
-        box, location = pair[0], pair[1]
+        box, location = as_pair(
+            pair,
+            'Each goal.box-at entry must be a pair [box, location]',
+            'goal.box-at pair members must be box and location names',
+        )
         if box not in box_set:
             raise ValueError(f'goal.box-at box must be a box; got "{box}"')
         if location not in loc_set:
             raise ValueError(f'goal.box-at location must be a location; got "{location}"')
-        goal_at.append((box, location))
+        goal_at.append((intern(box), intern(location)))
 
-    goal_clear_raw = goal.get("clear", [])
-    if goal_clear_raw is None:
-        goal_clear_raw = []
-    if not isinstance(goal_clear_raw, list):
-        raise ValueError('goal.clear must be a list of boxes and locations')
+    goal_clear_raw = optional_list(goal, "clear", 'goal.clear must be a list of boxes and locations')
     goal_clear: List[str] = []
     for box_or_location in goal_clear_raw:
         if not isinstance(box_or_location, str):
             raise ValueError('Each goal.clear entry must be a box or location name')
         if box_or_location not in box_set and box_or_location not in loc_set:
             raise ValueError(f'goal.clear box or location must be a box or location; got "{box_or_location}"')
-        goal_clear.append(box_or_location)
+        goal_clear.append(intern(box_or_location))
 
-    goal_pddl_raw = goal.get("pddl", [])
-    if goal_pddl_raw is None:
-        goal_pddl_raw = []
-    if not isinstance(goal_pddl_raw, list):
-        raise ValueError('goal.pddl must be a list of strings, each a PDDL formula')
+    goal_pddl_raw = optional_list(goal, "pddl", 'goal.pddl must be a list of strings, each a PDDL formula')
     goal_pddl: List[str] = []
     for i, formula in enumerate(goal_pddl_raw):
         if not isinstance(formula, str):
@@ -279,137 +386,252 @@ def load_ProblemSpec(path: str) -> ProblemSpec:
         goal_on=goal_on,
         goal_at=goal_at,
         goal_clear=goal_clear,
-        goal_pddl=goal_pddl
+        goal_pddl=goal_pddl,
+        loc_set=loc_set,
+        box_set=box_set,
     )
 
-    validate_spec(spec)
+    if validate:
+        validate_spec(spec)
     return spec
 
 
 def validate_spec(spec: ProblemSpec) -> None:
-    box_set = set(spec.boxes)
-
     # Each box appears exactly once across holding ∪ stacks
-    used: List[str] = []
+    used: Counter = Counter()
     if spec.holding is not None:
-        used.append(spec.holding)
+        used[spec.holding] += 1
 
-    for l, stack in spec.stacks.items():
-        used.extend(stack)
+    # (Repeats within a single stack are already rejected while parsing.)
+    for stack in spec.stacks.values():
+        used.update(stack)
 
-    dupes = {b for b in used if used.count(b) > 1}
+    dupes = {b for b, c in used.items() if c > 1}
     if dupes:
         raise ValueError(f"Each box must appear exactly once across holding and stacks. Duplicates: {sorted(dupes)}")
 
-    missing = box_set - set(used)
+    missing = spec.box_set - used.keys()
     if missing:
         raise ValueError(f"Each box must appear in holding or in some stack. Missing: {sorted(missing)}")
 
-    # Basic stack sanity: no repeated box within a single stack
-    for l, stack in spec.stacks.items():
-        if len(set(stack)) != len(stack):
-            raise ValueError(f'Stack at location "{l}" contains duplicate box names: {stack}')
-
 
 # -----------------------------
 # PDDL generation
 # -----------------------------
 
-def color_facts(props: Dict[str, Dict[str, Any]]) -> List[str]:
-    facts: List[str] = []
-    for name, pr in props.items():
-        if not isinstance(pr, dict):
-            continue
-        c = pr.get("color", None)
-        if c == "black":
-            facts.append(atom("black", name))
-        elif c == "white":
-            facts.append(atom("white", name))
-    return facts
-
-
 def init_facts(spec: ProblemSpec) -> List[str]:
+    # Atoms are built by plain concatenation with fixed predicate prefixes:
+    # this is the hot loop of the generator and the predicate/arity is known
+    # up front.
     facts: List[str] = []
+    append = facts.append
+    extend = facts.extend
 
     # robot
-    facts.append(atom("robot-at", spec.robot_at))
+    append("(robot-at " + spec.robot_at + ")")
 
     # hand state
     if spec.holding is None:
-        facts.append(atom("hands-empty"))
+        append("(hands-empty)")
     else:
-        facts.append(atom("holding", spec.holding))
+        append("(holding " + spec.holding + ")")
 
-    # colors for all objects (locations + boxes)
-    # Merge maps, with locations/boxes both supported
-    merged: Dict[str, Dict[str, Any]] = {}
-    merged.update(spec.loc_props)
-    merged.update(spec.box_props)
-    facts.extend(color_facts(merged))
+    # colors for all objects (locations + boxes); parse_named_objects
+    # guarantees every props value is a dict.
+    for name, pr in chain(spec.loc_props.items(), spec.box_props.items()):
+        c = pr.get("color")
+        if c == "black":
+            append("(black " + name + ")")
+        elif c == "white":
+            append("(white " + name + ")")
 
     # forbidden stack
     for top, bottom in spec.forbidden_stack:
-        facts.append(atom("forbidden-stack", top, bottom))
+        append("(forbidden-stack " + top + " " + bottom + ")")
 
-    # stacks: TOP -> BOTTOM
-    occupied_locations: Set[str] = set()
-    for l, stack in spec.stacks.items():
-        if not stack:
-            continue
-        occupied_locations.add(l)
+    # stacks: TOP -> BOTTOM, visited in location order so the facts come out
+    # grouped by predicate (box-at, on, clear) in a deterministic order.
+    stacks = spec.stacks
+    stacked = [(l, stacks[l]) for l in spec.locations if stacks.get(l)]
 
-        # box-at for all boxes in this stack
-        for b in stack:
-            facts.append(atom("box-at", b, l))
+    # box-at for all boxes in each stack
+    for l, stack in stacked:
+        at_l = " " + l + ")"
+        extend(["(box-at " + b + at_l for b in stack])
 
-        # on relations: t0 on t1, ..., tk on location
-        if len(stack) == 1:
-            # single box is both top and bottom
-            facts.append(atom("on", stack[0], l))
-            facts.append(atom("clear", stack[0]))
-        else:
-            for i in range(0, len(stack) - 1):
-                facts.append(atom("on", stack[i], stack[i+1]))
-            facts.append(atom("on", stack[-1], l))
-            facts.append(atom("clear", stack[0]))  # top is clear
+    # on relations: t0 on t1, ..., tk on location
+    for l, stack in stacked:
+        extend(["(on " + upper + " " + lower + ")" for upper, lower in zip(stack, stack[1:])])
+        append("(on " + stack[-1] + " " + l + ")")
 
-    # empty locations are clear
-    for l in spec.locations:
-        if l not in occupied_locations:
-            facts.append(atom("clear", l))
+    # the top of each stack is clear; empty locations are clear
+    tops = {l: stack[0] for l, stack in stacked}
+    extend(["(clear " + tops.get(l, l) + ")" for l in spec.locations])
 
     return facts
 
 
 def goal_formula(spec: ProblemSpec) -> str:
-    atoms = [atom("on", top, support) for (top, support) in spec.goal_on]
-    atoms.extend([atom("box-at", box, location) for (box, location) in spec.goal_at])
-    atoms.extend([atom("clear", name) for name in spec.goal_clear])
+    atoms = [_atom2("on", top, support) for (top, support) in spec.goal_on]
+    atoms.extend([_atom2("box-at", box, location) for (box, location) in spec.goal_at])
+    atoms.extend([_atom1("clear", name) for name in spec.goal_clear])
     atoms.extend(spec.goal_pddl)
     return and_formula(atoms)
 
 
-def emit_pddl_problem(spec: ProblemSpec) -> str:
-    # deterministic object ordering:
-    locs = spec.locations[:] if isinstance(spec.locations, list) else sorted(spec.locations)
-    boxes = spec.boxes[:] if isinstance(spec.boxes, list) else sorted(spec.boxes)
+def iter_pddl_problem(spec: ProblemSpec) -> Iterator[str]:
+    """
+    Yield the PDDL problem for spec as newline-terminated chunks, so callers
+    can stream it out without assembling the whole document in memory.
+    """
+    # spec.locations/spec.boxes are already lists in deterministic order
+    # (see parse_named_objects); spec is only read here, never mutated.
+    objects_str = " ".join(spec.boxes) + " - box\n          " + " ".join(spec.locations) + " - location"
+
+    # The fixed parts of the document are yielded as single templated
+    # chunks; only the :init block scales with the problem size.
+    yield (
+        f"(define (problem {spec.problem_name})\n"
+        "  (:domain BOX-WORLD)\n"
+        f"  (:objects {objects_str})\n"
+        "  (:init\n"
+    )
+    # init_facts() emits atoms in a canonical order by construction
+    for f in init_facts(spec):
+        yield "    " + f + "\n"
+    yield (
+        "  )\n"
+        f"  (:goal {goal_formula(spec)})\n"
+        ")\n"
+    )
+
+def emit_pddl_problem(spec: ProblemSpec, out: TextIO) -> None:
+    """Write the PDDL problem for spec to the text stream out."""
+    out.writelines(iter_pddl_problem(spec))
 
-    objects_str = " ".join(boxes) + " - box\n          " + " ".join(locs) + " - location"
+def emit_pddl_problem_str(spec: ProblemSpec) -> str:
+    """Return the PDDL problem for spec as one string."""
+    return "".join(iter_pddl_problem(spec))
 
-    init = init_facts(spec)
-    init_sorted = sorted(init)  # stable across runs; remove if you prefer input ordering
+def _write_fd(fd: int, data: bytes) -> None:
+    """Write all of data to the raw file descriptor fd, then close it."""
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+# -----------------------------
+# Output cache
+# -----------------------------
+
+# Bump whenever the generated PDDL for a given JSON input changes, so stale
+# cache entries are never served.
+CACHE_VERSION = b"box-world-pddl/2"
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "box-world")
+
+def cache_key(raw: bytes, sort_keys: bool = False, validate: bool = True) -> str:
+    """Content hash of a JSON instance (plus CACHE_VERSION and load options)."""
+    # Unvalidated output gets its own key so it is never served to a validating run.
+    salt = CACHE_VERSION + (b"/sort-keys" if sort_keys else b"") + (b"" if validate else b"/no-validate")
+    if blake3 is not None:
+        h = blake3.blake3(salt)
+    else:
+        h = hashlib.blake2b(salt, digest_size=16)
+    h.update(raw)
+    return h.hexdigest()
+
+def cached_pddl_path(raw: bytes, cache_dir: str, sort_keys: bool = False, validate: bool = True) -> str:
+    """
+    Return the path of the cached PDDL problem for the JSON bytes raw,
+    generating and storing it first on a cache miss.
+    """
+    path = os.path.join(cache_dir, cache_key(raw, sort_keys, validate) + ".pddl")
+    if os.path.exists(path):
+        return path
+
+    # Parse/validate before touching the cache so invalid input leaves no entry.
+    spec = loads_ProblemSpec(raw, sort_keys=sort_keys, validate=validate)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=cache_dir)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            emit_pddl_problem(spec, f)
+        os.replace(tmp_path, path)  # atomic: readers never see a partial entry
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+# -----------------------------
+# Conversion drivers
+# -----------------------------
+
+def convert_file(
+    json_path: str,
+    out_path: str,
+    sort_keys: bool = False,
+    cache_dir: Optional[str] = None,
+    validate: bool = True,
+) -> None:
+    """Convert one JSON instance into a PDDL problem file at out_path."""
+    if cache_dir:
+        with open(json_path, "rb") as f:
+            pddl_path = cached_pddl_path(f.read(), cache_dir, sort_keys, validate)
+        shutil.copyfile(pddl_path, out_path)
+        return
+
+    spec = load_ProblemSpec(json_path, sort_keys=sort_keys, validate=validate)
+    with open(out_path, "w", encoding="utf-8") as f:
+        emit_pddl_problem(spec, f)
+
+
+def _convert_task(task: Tuple[str, str, bool, Optional[str], bool]) -> Optional[str]:
+    # Worker entry point for convert_batch; returns an error message instead
+    # of raising for any exception, since one escaping pool.map would abort
+    # the whole batch and lose the reports for every other instance.
+    json_path, out_path, sort_keys, cache_dir, validate = task
+    try:
+        convert_file(json_path, out_path, sort_keys, cache_dir, validate)
+    except Exception as exc:
+        return f"{json_path}: {exc}"
+    return None
+
+
+def convert_batch(
+    in_dir: str,
+    out_dir: str,
+    jobs: int = 1,
+    sort_keys: bool = False,
+    cache_dir: Optional[str] = None,
+    validate: bool = True,
+) -> List[str]:
+    """
+    Convert every *.json file in in_dir into out_dir/<name>.pddl within one
+    process tree, using up to `jobs` worker processes.
+
+    Returns the error messages of the instances that failed to convert.
+    """
+    json_paths = sorted(glob.glob(os.path.join(in_dir, "*.json")))
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [
+        (p, os.path.join(out_dir, os.path.splitext(os.path.basename(p))[0] + ".pddl"), sort_keys, cache_dir, validate)
+        for p in json_paths
+    ]
+
+    # Conversion is CPU-bound Python, so parallelism needs processes, not threads.
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(_convert_task, tasks))
+    else:
+        results = [_convert_task(t) for t in tasks]
+    return [err for err in results if err is not None]
 
-    lines: List[str] = []
-    lines.append(f"(define (problem {spec.problem_name})")
-    lines.append("  (:domain BOX-WORLD)")
-    lines.append(f"  (:objects {objects_str})")
-    lines.append("  (:init")
-    for f in init_sorted:
-        lines.append(f"    {f}")
-    lines.append("  )")
-    lines.append(f"  (:goal {goal_formula(spec)})")
-    lines.append(")")
-    return "\n".join(lines)
 
 def parse_action_atom(line: str) -> Dict[str, List[str]]:
     """
@@ -418,6 +640,14 @@ def parse_action_atom(line: str) -> Dict[str, List[str]]:
     into:
         {"unstack": ["b1", "l1"]}
     """
+    action, args = _split_action_atom(line)
+    # Fresh list per call: the cached tuple must not be shared with callers.
+    return {action: list(args)}
+
+@lru_cache(maxsize=8192)
+def _split_action_atom(line: str) -> Tuple[str, Tuple[str, ...]]:
+    # Plans repeat the same ground actions many times (and successive plan.N
+    # files largely overlap), so memoize the tokenization per distinct line.
     line = line.strip()
 
     if not (line.startswith("(") and line.endswith(")")):
@@ -430,10 +660,36 @@ def parse_action_atom(line: str) -> Dict[str, List[str]]:
         raise ValueError(f"Empty PDDL atom: {line}")
 
     tokens = inner.split()
-    action = tokens[0]
-    args = tokens[1:]
+    return tokens[0], tuple(tokens[1:])
 
-    return {action: args}
+def find_best_plan(plan_base: str) -> Optional[str]:
+    """
+    Return the path of the plan file "<plan_base>.N" with the largest N,
+    or None if the planner wrote no plan files.
+    """
+    plan_dir, prefix = os.path.split(plan_base)
+    prefix += "."
+    best_path: Optional[str] = None
+    best_n = -1
+
+    # A single directory listing; no glob pattern expansion or regex per entry.
+    with os.scandir(plan_dir or ".") as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.startswith(prefix):
+                continue
+            suffix = name[len(prefix):]
+            if not suffix.isdecimal():
+                continue
+            n = int(suffix)
+            if n > best_n:
+                best_n = n
+                best_path = entry.path
+
+    return best_path
+
+# e.g. "; cost = 12 (unit cost)"
+_COST_RE = re.compile(r"cost\s*=\s*([0-9]+)")
 
 def parse_fd_plan_text(plan_text: str) -> Tuple[List[str], Optional[int]]:
     """
@@ -454,13 +710,13 @@ def parse_fd_plan_text(plan_text: str) -> Tuple[List[str], Optional[int]]:
 
         # comment lines
         if line.startswith(";"):
-            m = re.search(r"cost\s*=\s*([0-9]+)", line)
+            m = _COST_RE.search(line)
             if m:
                 cost = int(m.group(1))
             continue
 
-        # action lines
-        if line.startswith("(") and line.endswith(")"):
+        # action lines (parse_action_atom rejects a missing closing paren)
+        if line[0] == "(":
             steps.append(parse_action_atom(line))
         else:
             # If your planner outputs non-parenthesized actions, you can decide:
@@ -470,6 +726,61 @@ def parse_fd_plan_text(plan_text: str) -> Tuple[List[str], Optional[int]]:
 
     return steps, cost
 
+class PlanWatcher:
+    """
+    Poll for plan files "<plan_base>.N" in a background thread while the
+    planner runs and parse the newest one as soon as it appears, so that the
+    final plan is usually parsed by the time the planner exits.
+    """
+
+    def __init__(self, plan_base: str, interval: float = 0.2) -> None:
+        self.plan_base = plan_base
+        self.interval = interval
+        # path -> (size in bytes when parsed, (steps, cost))
+        self._parsed: Dict[str, Tuple[int, Tuple[List[Any], Optional[int]]]] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def best_plan(self) -> Optional[Tuple[List[Any], Optional[int]]]:
+        """
+        Return (steps, cost) of the best plan file, reusing the background
+        parse if the file has not changed since. Call after stop().
+        """
+        path = find_best_plan(self.plan_base)
+        if path is None:
+            return None
+        return self._parse(path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            path = find_best_plan(self.plan_base)
+            if path is None:
+                continue
+            try:
+                self._parse(path)
+            except (OSError, ValueError):
+                # Possibly caught mid-write; best_plan() re-reads it later.
+                pass
+
+    def _parse(self, path: str) -> Tuple[List[Any], Optional[int]]:
+        # Plan files only grow while being written, so an unchanged size
+        # means the cached parse is current and the file need not be read.
+        cached = self._parsed.get(path)
+        if cached is not None and cached[0] == os.stat(path).st_size:
+            return cached[1]
+        with open(path, "rb") as f:
+            data = f.read()
+        result = parse_fd_plan_text(data.decode("utf-8"))
+        self._parsed[path] = (len(data), result)
+        return result
+
 def main() -> None:
     ap = argparse.ArgumentParser(
         description="Convert Box-World JSON (v1) to PDDL, and optionally run an external planner."
@@ -480,14 +791,62 @@ def main() -> None:
     # convert subcommand
     # -------------------------
     ap_convert = sub.add_parser("convert", help="Convert JSON instance to a PDDL problem file.")
-    ap_convert.add_argument("json_path", help="Path to the JSON instance file")
+    ap_convert.add_argument("json_path", nargs="?", help="Path to the JSON instance file")
     ap_convert.add_argument("-o", "--out", help="Output .pddl path (default: stdout)")
+    ap_convert.add_argument(
+        "--sort-keys",
+        action="store_true",
+        help="Order locations/boxes given as JSON objects by sorted name instead of input order.",
+    )
+    ap_convert.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Skip the check that each box appears exactly once across holding and stacks "
+             "(for trusted, generated instances).",
+    )
+    ap_convert.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse PDDL previously generated from identical JSON content.",
+    )
+    ap_convert.add_argument(
+        "--cache-dir",
+        default=default_cache_dir(),
+        help="Directory for --cache entries (default: ~/.cache/box-world).",
+    )
+    ap_convert.add_argument(
+        "--batch",
+        metavar="DIR",
+        help="Convert every *.json file in DIR in a single run (instead of json_path).",
+    )
+    ap_convert.add_argument(
+        "--out-dir",
+        metavar="DIR",
+        help="Output directory for --batch (default: the --batch directory).",
+    )
+    ap_convert.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Worker processes for --batch (default: number of CPUs).",
+    )
 
     # -------------------------
     # solve subcommand
     # -------------------------
     ap_solve = sub.add_parser("solve", help="Generate PDDL problem and call an external planner; return best plan.")
     ap_solve.add_argument("json_path", help="Path to the JSON instance file")
+    ap_solve.add_argument(
+        "--sort-keys",
+        action="store_true",
+        help="Order locations/boxes given as JSON objects by sorted name instead of input order.",
+    )
+    ap_solve.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Skip the check that each box appears exactly once across holding and stacks "
+             "(for trusted, generated instances).",
+    )
     ap_solve.add_argument(
         "--domain",
         default="./box-world-domain.pddl",
@@ -538,37 +897,66 @@ def main() -> None:
     # convert mode
     # -------------------------
     if args.cmd == "convert":
-        spec = load_ProblemSpec(args.json_path)
-        pddl = emit_pddl_problem(spec)
+        cache_dir = args.cache_dir if args.cache else None
+
+        if args.batch:
+            if args.json_path or args.out:
+                ap_convert.error("--batch cannot be combined with json_path or --out")
+            if not os.path.isdir(args.batch):
+                ap_convert.error(f"--batch: not a directory: {args.batch}")
+            if args.jobs is not None and args.jobs < 1:
+                ap_convert.error("--jobs must be at least 1")
+            errors = convert_batch(
+                args.batch,
+                args.out_dir or args.batch,
+                jobs=args.jobs or os.cpu_count() or 1,
+                sort_keys=args.sort_keys,
+                cache_dir=cache_dir,
+                validate=not args.no_validate,
+            )
+            for err in errors:
+                print(err, file=sys.stderr)
+            if errors:
+                raise SystemExit(1)
+            return
+
+        if not args.json_path:
+            ap_convert.error("json_path is required unless --batch is given")
+        if args.out_dir or args.jobs is not None:
+            ap_convert.error("--out-dir and --jobs require --batch")
+
         if args.out:
-            with open(args.out, "w", encoding="utf-8") as f:
-                f.write(pddl + "\n")
+            convert_file(args.json_path, args.out, args.sort_keys, cache_dir, not args.no_validate)
+        elif cache_dir:
+            with open(args.json_path, "rb") as f:
+                pddl_path = cached_pddl_path(f.read(), cache_dir, args.sort_keys, not args.no_validate)
+            with open(pddl_path, "r", encoding="utf-8") as f:
+                shutil.copyfileobj(f, sys.stdout)
         else:
-            print(pddl)
+            spec = load_ProblemSpec(args.json_path, sort_keys=args.sort_keys, validate=not args.no_validate)
+            emit_pddl_problem(spec, sys.stdout)
         return
 
     # -------------------------
     # solve mode
     # -------------------------
     if args.cmd == "solve":
-        # 1) Generate problem PDDL text
-        spec = load_ProblemSpec(args.json_path)
-        problem_pddl = emit_pddl_problem(spec)
+        # 1) Load the problem spec (PDDL is written straight into the temp dir below)
+        spec = load_ProblemSpec(args.json_path, sort_keys=args.sort_keys, validate=not args.no_validate)
 
         # 2) Use a temp dir unless keep-tmp is requested (then we still use temp dir but don't delete)
         tmp_ctx = tempfile.TemporaryDirectory()
         tmpdir = tmp_ctx.name
 
         try:
-            # Write problem to temp file
-            problem_path = os.path.join(tmpdir, f"{spec.problem_name}.pddl")
-            with open(problem_path, "w", encoding="utf-8") as f:
-                f.write(problem_pddl + "\n")
+            # Write problem to temp file (rendered once, unbuffered fd writes)
+            problem_pddl = emit_pddl_problem_str(spec).encode("utf-8")
+            fd, problem_path = tempfile.mkstemp(prefix=f"{spec.problem_name}-", suffix=".pddl", dir=tmpdir)
+            _write_fd(fd, problem_pddl)
 
             # Optionally also write problem to a user-specified path
             if args.problem_out:
-                with open(args.problem_out, "w", encoding="utf-8") as f:
-                    f.write(problem_pddl + "\n")
+                _write_fd(os.open(args.problem_out, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666), problem_pddl)
 
             # Plan basename in temp dir (planner will create plan.1, plan.2, ...)
             plan_base = os.path.join(tmpdir, "plan")
@@ -583,52 +971,46 @@ def main() -> None:
                 problem_path,
             ])
 
-            # 4) Run planner
-            res = subprocess.run(cmd, capture_output=False, text=True)
-            if res.returncode != 0:
-                # Surface planner stderr/stdout for debugging
-                print("return code:", res.returncode)
+            # 4) Run planner, parsing plan files in the background as the
+            #    (anytime) planner writes them. Planner stdout/stderr go
+            #    straight to the console.
+            watcher = PlanWatcher(plan_base)
+            with subprocess.Popen(cmd) as proc:
+                watcher.start()
+                try:
+                    returncode = proc.wait()
+                except BaseException:
+                    # As subprocess.run does: never leave the planner running
+                    # (e.g. on Ctrl-C) while its temp dir is removed below.
+                    proc.kill()
+                    proc.wait()
+                    raise
+                finally:
+                    watcher.stop()
+
+            if returncode != 0:
                 raise RuntimeError(
-                    "Planner failed.\n"
-                    f"Command: {' '.join(cmd)}\n\n"
-                    f"STDOUT:\n{res.stdout}\n\n"
-                    f"STDERR:\n{res.stderr}\n"
+                    f"Planner failed with return code {returncode}.\n"
+                    f"Command: {' '.join(cmd)}\n"
                 )
 
-            # 5) Find best plan file plan.N with largest N
-            plan_candidates = glob.glob(plan_base + ".*")
-            best_path = None
-            best_n = None
-
-            for p in plan_candidates:
-                m = re.match(r".*\.(\d+)$", p)
-                if not m:
-                    continue
-                n = int(m.group(1))
-                if best_n is None or n > best_n:
-                    best_n = n
-                    best_path = p
-
-            if best_path is None:
+            # 5) Best plan file plan.N with largest N (usually already parsed)
+            best = watcher.best_plan()
+            if best is None:
                 raise RuntimeError(
                     "Planner succeeded but no plan files were found.\n"
                     f"Looked for files matching: {plan_base}.*\n"
-                    f"STDOUT:\n{res.stdout}\n\n"
-                    f"STDERR:\n{res.stderr}\n"
                 )
 
             # 6) Return best plan: write to file or print
-            with open(best_path, "r", encoding="utf-8") as f:
-                best_plan_text = f.read()
-
-            steps, cost = parse_fd_plan_text(best_plan_text)
+            steps, cost = best
 
             plan_json_obj = {
                 "plan": steps,
                 "cost": cost,
             }
 
-            plan_json_str = json.dumps(plan_json_obj, indent=2)
+            plan_json_str = _dumps(plan_json_obj)
 
             if args.plan_json_out:
                 # Ensure destination directory exists
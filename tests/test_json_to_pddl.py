@@ -0,0 +1,216 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = ROOT / "json-to-pddl.py"
+
+
+def make_problem(**overrides):
+    problem = {
+        "problem_name": "two-stacks",
+        "locations": ["L1", "L2", "L3"],
+        "boxes": ["B1", "B2", "B3"],
+        "initial_state": {
+            "robot_at": "L2",
+            "stacks": {"L3": ["B3"], "L1": ["B1", "B2"]},
+        },
+        "goal": {"on": [["B1", "L2"]]},
+    }
+    problem.update(overrides)
+    return problem
+
+
+class ConvertTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_problem(self, problem, name: str = "problem.json") -> str:
+        path = Path(self.tmp.name) / name
+        path.write_text(json.dumps(problem), encoding="utf-8")
+        return str(path)
+
+    def run_script(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(SCRIPT), *args],
+            cwd=ROOT,
+            text=True,
+            capture_output=True,
+            check=False,
+        )
+
+    def init_block(self, pddl: str) -> list:
+        lines = pddl.splitlines()
+        start = lines.index("  (:init")
+        end = lines.index("  )", start)
+        return [line.strip() for line in lines[start + 1:end]]
+
+    def test_init_facts_grouped_in_canonical_order(self) -> None:
+        result = self.run_script("convert", self.write_problem(make_problem()))
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(
+            self.init_block(result.stdout),
+            [
+                "(robot-at L2)",
+                "(hands-empty)",
+                "(box-at B1 L1)",
+                "(box-at B2 L1)",
+                "(box-at B3 L3)",
+                "(on B1 B2)",
+                "(on B2 L1)",
+                "(on B3 L3)",
+                "(clear B1)",
+                "(clear L2)",
+                "(clear B3)",
+            ],
+        )
+
+    def test_object_form_keeps_json_order_unless_sort_keys(self) -> None:
+        problem = make_problem(locations={"L3": {}, "L1": None, "L2": {"color": "black"}})
+        path = self.write_problem(problem)
+
+        result = self.run_script("convert", path)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("L3 L1 L2 - location", result.stdout)
+
+        result = self.run_script("convert", path, "--sort-keys")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("L1 L2 L3 - location", result.stdout)
+
+    def test_rejects_goal_pair_given_as_string(self) -> None:
+        problem = make_problem(goal={"on": ["B1"]})
+
+        result = self.run_script("convert", self.write_problem(problem))
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Each goal.on entry must be a pair", result.stderr)
+
+    def test_reports_all_missing_top_level_fields(self) -> None:
+        problem = make_problem()
+        del problem["boxes"], problem["goal"]
+
+        result = self.run_script("convert", self.write_problem(problem))
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Missing required top-level fields: boxes, goal", result.stderr)
+
+    def test_no_validate_skips_box_placement_check(self) -> None:
+        # B3 is declared but neither held nor stacked.
+        problem = make_problem(initial_state={"robot_at": "L2", "stacks": {"L1": ["B1", "B2"]}})
+        path = self.write_problem(problem)
+
+        result = self.run_script("convert", path)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("Missing: ['B3']", result.stderr)
+
+        result = self.run_script("convert", path, "--no-validate")
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_cache_reuses_output_for_identical_json(self) -> None:
+        path = self.write_problem(make_problem())
+        cache_dir = Path(self.tmp.name) / "cache"
+
+        first = self.run_script("convert", path, "--cache", "--cache-dir", str(cache_dir))
+        self.assertEqual(first.returncode, 0, first.stderr)
+        entries = list(cache_dir.glob("*.pddl"))
+        self.assertEqual(len(entries), 1)
+
+        # A hit is served from the cache entry, not regenerated.
+        entries[0].write_text("cached\n", encoding="utf-8")
+        second = self.run_script("convert", path, "--cache", "--cache-dir", str(cache_dir))
+        self.assertEqual(second.returncode, 0, second.stderr)
+        self.assertEqual(second.stdout, "cached\n")
+
+        uncached = self.run_script("convert", path)
+        self.assertEqual(uncached.stdout, first.stdout)
+
+    def test_batch_converts_directory_and_reports_failures(self) -> None:
+        in_dir = Path(self.tmp.name) / "in"
+        out_dir = Path(self.tmp.name) / "out"
+        in_dir.mkdir()
+        (in_dir / "a.json").write_text(json.dumps(make_problem(problem_name="a")), encoding="utf-8")
+        (in_dir / "b.json").write_text(json.dumps(make_problem(problem_name="b")), encoding="utf-8")
+        (in_dir / "bad.json").write_text(json.dumps(make_problem(boxes=["B1"])), encoding="utf-8")
+
+        result = self.run_script("convert", "--batch", str(in_dir), "--out-dir", str(out_dir), "--jobs", "2")
+
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("bad.json", result.stderr)
+        self.assertEqual(sorted(p.name for p in out_dir.iterdir()), ["a.pddl", "b.pddl"])
+        single = self.run_script("convert", str(in_dir / "a.json"))
+        self.assertEqual((out_dir / "a.pddl").read_text(encoding="utf-8"), single.stdout)
+
+    def test_batch_rejects_missing_directory_and_stray_options(self) -> None:
+        out_dir = Path(self.tmp.name) / "out"
+
+        result = self.run_script("convert", "--batch", str(Path(self.tmp.name) / "nope"), "--out-dir", str(out_dir))
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("--batch: not a directory", result.stderr)
+        self.assertFalse(out_dir.exists())
+
+        path = self.write_problem(make_problem())
+        result = self.run_script("convert", "--batch", path)
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("--batch: not a directory", result.stderr)
+
+        result = self.run_script("convert", path, "--out-dir", str(out_dir), "--jobs", "2")
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("--out-dir and --jobs require --batch", result.stderr)
+
+    def test_batch_reports_non_string_references_per_file(self) -> None:
+        in_dir = Path(self.tmp.name) / "in"
+        out_dir = Path(self.tmp.name) / "out"
+        in_dir.mkdir()
+        (in_dir / "a.json").write_text(json.dumps(make_problem(problem_name="a")), encoding="utf-8")
+        nested = make_problem(forbidden_stack=[[["x"], "B1"]])
+        (in_dir / "nested.json").write_text(json.dumps(nested), encoding="utf-8")
+        robot = make_problem(initial_state={"robot_at": [], "stacks": {"L1": ["B1", "B2", "B3"]}})
+        (in_dir / "robot.json").write_text(json.dumps(robot), encoding="utf-8")
+
+        result = self.run_script("convert", "--batch", str(in_dir), "--out-dir", str(out_dir), "--jobs", "2")
+
+        self.assertEqual(result.returncode, 1)
+        self.assertNotIn("Traceback", result.stderr)
+        self.assertIn("nested.json: forbidden_stack pair members must be box names", result.stderr)
+        self.assertIn("robot.json: initial_state.robot_at must be a location name string", result.stderr)
+        self.assertEqual([p.name for p in out_dir.iterdir()], ["a.pddl"])
+
+
+FAKE_PLANNER = """\
+import sys, time
+base = sys.argv[sys.argv.index("--plan-file") + 1]
+for n, steps in ((2, ["(locomotion l2 l1)"] * 3), (10, ["(pickup b1 l1)"])):
+    with open(f"{base}.{n}", "w") as f:
+        f.write("\\n".join(steps) + f"\\n; cost = {len(steps)} (unit cost)\\n")
+    time.sleep(0.3)
+"""
+
+
+class SolveTests(unittest.TestCase):
+    def test_solve_returns_highest_numbered_plan(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            planner = Path(tmp) / "planner.py"
+            planner.write_text(f"#!{sys.executable}\n" + FAKE_PLANNER, encoding="utf-8")
+            planner.chmod(0o755)
+            problem = Path(tmp) / "problem.json"
+            problem.write_text(json.dumps(make_problem()), encoding="utf-8")
+
+            result = subprocess.run(
+                [sys.executable, str(SCRIPT), "solve", str(problem), "--planner", str(planner)],
+                cwd=ROOT,
+                text=True,
+                capture_output=True,
+                check=False,
+            )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout), {"plan": [{"pickup": ["b1", "l1"]}], "cost": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()